@@ -1,18 +1,23 @@
 import os
-import json
+import sys
+import orjson
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
-from src.dataset import Dataset, QUESTIONS
+from src.dataset import get_dataset, QUESTIONS
 from src.model_client import (
-    build_openai_client, query_openai,
-    query_deepinfra, clean_deepseek_response, DEEPINFRA_MODELS
+    get_openai_client, query_openai,
+    query_deepinfra, clean_deepseek_response, DEEPINFRA_MODELS,
+    set_cache_enabled
 )
 from lib.parse_logs import parse_logs
 
 load_dotenv()
 
+if "--no-cache" in sys.argv:
+    set_cache_enabled(False)
+
 OUTPUT_DIR = "responses_by_topic"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -46,8 +51,8 @@ def save_response(model, topic, filename, questions, response, timestamp):
     os.makedirs(topic_dir, exist_ok=True)
     file_out = os.path.join(topic_dir, f"response_{model}_{timestamp}.json")
     structure = format_model_response(model, filename, topic, questions, response, timestamp)
-    with open(file_out, "w", encoding="utf-8") as f:
-        json.dump(structure, f, ensure_ascii=False, indent=2)
+    with open(file_out, "wb") as f:
+        f.write(orjson.dumps(structure, option=orjson.OPT_INDENT_2))
     print(f"Saved: {file_out}")
 
 
@@ -103,18 +108,40 @@ def query_model(model_id, model_name, prompt, llm=None):
     return model_id, model_name, response
 
 
+def process_topic(dataset_key, filename, topic, prompt, questions, llm, timestamp):
+    """Run one topic end to end: query all models with its prompt, save results."""
+    print(f"\nDataset: {dataset_key} | Topic: {topic}")
+
+    # Query all models in parallel (one worker per model)
+    with ThreadPoolExecutor(max_workers=len(MODELS)) as executor:
+        futures = {
+            executor.submit(query_model, model_id, model_name, prompt, llm): model_name
+            for model_id, model_name in MODELS.items()
+        }
+        for future in as_completed(futures):
+            model_name = futures[future]
+            try:
+                model_id, model_name, response = future.result()
+                if response:
+                    save_response(model_name, topic, filename, questions, response, timestamp)
+                else:
+                    print(f"No response received from {model_name}.")
+            except Exception as e:
+                print(f"Error with model {model_name}: {e}")
+
+
 # Main pipeline ----------------------------------------------------------------
 
 def main():
-    ds = Dataset("data")
+    ds = get_dataset("data")
     all_topics = list(QUESTIONS.keys())
 
     selected_datasets = select_dataset()
     selected_topics = select_topic(all_topics)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    # Build OpenAI client once (reused across all datasets and topics)
-    llm = build_openai_client()
+    # Shared OpenAI client (reused across all datasets and topics)
+    llm = get_openai_client()
 
     for dataset_key in selected_datasets:
         csv_path, filename = DATASETS[dataset_key]
@@ -122,27 +149,28 @@ def main():
         parse_logs(csv_path, dataset_key)
         print(f"Log file: {filename}")
 
-        for topic in selected_topics:
-            print(f"\nDataset: {dataset_key} | Topic: {topic}")
-            prompt = ds.generate_prompt(filename, topic)
-            questions = ds.get_questions_by_topic(topic)
-
-            # Query all models in parallel
-            with ThreadPoolExecutor() as executor:
-                futures = {
-                    executor.submit(query_model, model_id, model_name, prompt, llm): model_name
-                    for model_id, model_name in MODELS.items()
-                }
-                for future in as_completed(futures):
-                    model_name = futures[future]
-                    try:
-                        model_id, model_name, response = future.result()
-                        if response:
-                            save_response(model_name, topic, filename, questions, response, timestamp)
-                        else:
-                            print(f"No response received from {model_name}.")
-                    except Exception as e:
-                        print(f"Error with model {model_name}: {e}")
+        # Build every topic prompt and question list up front (one log-file
+        # read, no duplicated work inside the worker threads), then fan out
+        topic_prompts = {
+            topic: (ds.generate_prompt(filename, topic), ds.get_questions_by_topic(topic))
+            for topic in selected_topics
+        }
+
+        # Process topics in parallel, bounded so the combined topic x model
+        # fan-out stays within provider rate limits
+        max_concurrency = int(os.getenv("MAX_CONCURRENCY", "4"))
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {
+                executor.submit(process_topic, dataset_key, filename, topic,
+                                *topic_prompts[topic], llm, timestamp): topic
+                for topic in selected_topics
+            }
+            for future in as_completed(futures):
+                topic = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error processing topic {topic}: {e}")
 
     print("\nProcess completed.")
 
@@ -1,18 +1,23 @@
 import os
-import json
+import sys
+import orjson
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
-from src.dataset import Dataset
+from src.dataset import get_dataset
 from src.model_client import (
-    build_openai_client, query_openai,
-    query_deepinfra, clean_deepseek_response
+    get_openai_client, query_openai,
+    query_deepinfra, clean_deepseek_response,
+    set_cache_enabled
 )
 from lib.parse_logs import parse_logs
 
 load_dotenv()
 
+if "--no-cache" in sys.argv:
+    set_cache_enabled(False)
+
 output_dir = "model_responses"
 os.makedirs(output_dir, exist_ok=True)
 
@@ -57,14 +62,14 @@ def query_model(model_id, prompt, llm=None):
 def save_response(model_id, filename, topic, prompt, answer, timestamp):
     output_path = os.path.join(output_dir, f"response_{model_id}_{timestamp}.json")
     display_name = "openai_gpt4" if model_id == "openai" else model_id
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump({
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps({
             "model": display_name,
             "file": filename,
             "topic": topic,
             "prompt": prompt,
             "answer": answer
-        }, f, ensure_ascii=False, indent=2)
+        }, option=orjson.OPT_INDENT_2))
     print(f"Response from {display_name} saved to: {output_path}")
     return output_path
 
@@ -89,7 +94,7 @@ def select_dataset():
 
 
 def main():
-    ds = Dataset("data/")
+    ds = get_dataset("data")
     topic = "Topic 1 - Basic Events"
 
     dataset_key, csv_path, filename = select_dataset()
@@ -103,7 +108,7 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     models_to_use = select_models()
 
-    llm = build_openai_client() if "openai" in models_to_use else None
+    llm = get_openai_client() if "openai" in models_to_use else None
 
     generated_answers = {}
 
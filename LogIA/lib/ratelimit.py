@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter covering both requests-per-minute (RPM) and
+    tokens-per-minute (TPM) caps.
+
+    A single bucket is meant to be shared by every worker thread that talks to
+    a provider: `acquire()` blocks until both budgets have capacity, so batch
+    jobs throttle themselves proactively instead of failing against the API
+    rate limits and backing off.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        """
+        Args:
+            rpm (int): Maximum requests per minute.
+            tpm (int): Maximum tokens per minute.
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Refill both buckets proportionally to the time elapsed since the last refill."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    def acquire(self, est_tokens: int):
+        """
+        Block until one request slot and `est_tokens` tokens are available,
+        then consume them.
+
+        Args:
+            est_tokens (int): Estimated token cost of the upcoming request.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._requests >= 1.0 and self._tokens >= est_tokens:
+                    self._requests -= 1.0
+                    self._tokens -= est_tokens
+                    return
+                wait_for_request = (1.0 - self._requests) * 60.0 / self.rpm
+                wait_for_tokens = (est_tokens - self._tokens) * 60.0 / self.tpm
+            time.sleep(max(wait_for_request, wait_for_tokens, 0.01))
@@ -1,7 +1,10 @@
-import os
-import json
+import mmap
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from types import MappingProxyType
+from typing import Iterator, List, Dict, Optional
+
+import orjson
 
 # --------------------------
 #  Questions per topic
@@ -116,6 +119,59 @@ ONE_SHOT_EXAMPLES = {
     }
 }
 
+# --------------------------
+# Precomputed per-topic constants, so generate_prompt never re-joins or
+# re-serializes static content
+# --------------------------
+PROMPT_HEADER = "Answer the questions strictly following the templates as precisely as possible.\n"
+
+QUESTIONS_JOINED = {topic: "\n".join(questions) for topic, questions in QUESTIONS.items()}
+
+# Examples use the same compact one-record-per-line JSON as the real logs
+# block; indentation only inflates the prompt token count
+ONE_SHOT_RENDERED = {
+    topic: (
+        "\n### Example:\n"
+        + "\n".join(orjson.dumps(record).decode() for record in example["logs"])
+        + "\n" + example["answer"] + "\n"
+    )
+    for topic, example in ONE_SHOT_EXAMPLES.items()
+}
+
+
+# --------------------------
+# JSONL helpers
+# --------------------------
+def _estimate_tokens(text) -> int:
+    """Rough token estimate for a piece of prompt text or bytes (~4 chars/token)."""
+    return len(text) // 4 + 1
+
+
+def _iter_mmap_logs(file_path: Path) -> Iterator[Dict]:
+    """
+    Yield parsed log entries from a JSONL file by scanning newline offsets in
+    a memory map, avoiding the line-tokenizing overhead of a Python file loop.
+
+    Args:
+        file_path (Path): Path to the JSONL file.
+
+    Yields:
+        Dict: Parsed log entries.
+    """
+    if file_path.stat().st_size == 0:
+        return
+    with file_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while (end := mm.find(b"\n", start)) != -1:
+            line = mm[start:end]
+            if line.strip():
+                yield orjson.loads(line)
+            start = end + 1
+        tail = mm[start:]
+        if tail.strip():
+            yield orjson.loads(tail)
+
+
 # --------------------------
 # Main Dataset class
 # --------------------------
@@ -131,12 +187,19 @@ class Dataset:
     - Display formatted answers from saved model responses.
     """
 
-    def __init__(self, data_path: str):
+    # Read-only views of the module constants, bound on the class so hot-path
+    # lookups are a plain attribute access
+    QUESTIONS = MappingProxyType(QUESTIONS)
+    RESPONSE_STYLES = MappingProxyType(RESPONSE_STYLES)
+
+    def __init__(self, data_path: str, max_prompt_tokens: int = 3000):
         """
         Initialize the Dataset object, validating that the directory exists.
 
         Args:
             data_path (str): Path to the dataset directory containing .json files.
+            max_prompt_tokens (int): Approximate token budget for generated
+                prompts; log entries are included until the budget is reached.
 
         Raises:
             FileNotFoundError: If the dataset path does not exist.
@@ -144,9 +207,20 @@ class Dataset:
         self.data_path = Path(data_path).resolve()
         if not self.data_path.exists():
             raise FileNotFoundError("The path does not exist. Verify the JSON files.")
+        self.max_prompt_tokens = max_prompt_tokens
+        # Everything around the real-logs block is constant per topic, so
+        # specialize each topic to a ready-made (head, tail) template pair,
+        # pre-encoded so prompts assemble as bytes alongside orjson output
+        self._prompt_builders = {
+            topic: (
+                (PROMPT_HEADER + ONE_SHOT_RENDERED.get(topic, "") + "\n### Real logs:\n").encode("utf-8"),
+                ("\n\n" + self.RESPONSE_STYLES[topic] + QUESTIONS_JOINED[topic]).encode("utf-8"),
+            )
+            for topic in self.QUESTIONS
+        }
         self.files = self._get_json_files()
-        self._log_cache: Dict[str, List[Dict]] = {}
-        self._prompt_cache: Dict[tuple, str] = {}
+        self._log_cache: Dict[tuple, List[Dict]] = {}
+        self._prompt_cache: Dict[tuple, bytes] = {}
 
     def _get_json_files(self) -> List[Path]:
         """
@@ -157,21 +231,38 @@ class Dataset:
         """
         return list(self.data_path.glob("*.json"))
 
-    def load_logs(self, file_name: str) -> List[Dict]:
+    def load_logs(self, file_name: str, limit: Optional[int] = None) -> List[Dict]:
         """
         Load logs from a JSON file line by line. Results are cached in memory.
 
         Args:
             file_name (str): Name of the JSON log file.
+            limit (Optional[int]): Maximum number of entries to read; reading
+                stops as soon as the limit is reached, so only the needed
+                prefix of the file is parsed.
 
         Returns:
             List[Dict]: Parsed log entries.
         """
-        if file_name not in self._log_cache:
-            file_path = self.data_path / file_name
-            with file_path.open("r", encoding="utf-8") as f:
-                self._log_cache[file_name] = [json.loads(line) for line in f]
-        return self._log_cache[file_name]
+        file_path = self.data_path / file_name
+        # Key on mtime so a regenerated file (e.g. after parse_logs reruns)
+        # invalidates the cached entries automatically
+        cache_key = (file_name, limit, file_path.stat().st_mtime_ns)
+        if cache_key not in self._log_cache:
+            if limit is None:
+                # Full read: scan the memory-mapped file directly
+                self._log_cache[cache_key] = list(_iter_mmap_logs(file_path))
+            else:
+                logs: List[Dict] = []
+                # 64 KB buffer: most prompt-sized prefixes fit in one read
+                with file_path.open("rb", buffering=65536) as f:
+                    for line in f:
+                        if len(logs) >= limit:
+                            break
+                        if line.strip():
+                            logs.append(orjson.loads(line))
+                self._log_cache[cache_key] = logs
+        return self._log_cache[cache_key]
 
     def get_questions_by_topic(self, topic: str) -> List[str]:
         """
@@ -183,28 +274,17 @@ class Dataset:
         Returns:
             List[str]: Questions for the topic.
         """
-        return QUESTIONS.get(topic, [])
+        return self.QUESTIONS.get(topic, [])
 
-    def _get_response_style(self, topic: str) -> str:
-        """
-        Get the response style instructions for a given topic.
-
-        Args:
-            topic (str): Topic name.
-
-        Returns:
-            str: Response style instructions.
+    def generate_prompt_bytes(self, file_name: str, topic: str) -> bytes:
         """
-        return RESPONSE_STYLES.get(topic, "")
-
-    def generate_prompt(self, file_name: str, topic: str) -> str:
-        """
-        Generate a model prompt by combining:
-        - Real logs (sample of first 44 entries).
+        Generate a model prompt as UTF-8 bytes by combining:
+        - Real logs (as many entries as fit in the token budget).
         - A one-shot example (if available).
         - The required response style.
         - The topic-specific questions.
 
+        Building as bytes keeps orjson output unconverted end to end.
         Results are cached so repeated calls with the same arguments are free.
 
         Args:
@@ -212,29 +292,47 @@ class Dataset:
             topic (str): Topic to generate prompt for.
 
         Returns:
-            str: Constructed prompt for the model.
+            bytes: Constructed prompt for the model.
         """
-        cache_key = (file_name, topic)
+        # mtime in the key keeps cached prompts in sync with regenerated files
+        cache_key = (file_name, topic, (self.data_path / file_name).stat().st_mtime_ns)
         if cache_key in self._prompt_cache:
             return self._prompt_cache[cache_key]
 
-        logs = self.load_logs(file_name)[:44]
-        style = self._get_response_style(topic)
-        questions = "\n".join(self.get_questions_by_topic(topic))
-        prompt = "Answer the questions strictly following the templates as precisely as possible.\n"
-
-        if one_shot := ONE_SHOT_EXAMPLES.get(topic):
-            prompt += "\n### Example:\n"
-            prompt += json.dumps(one_shot["logs"], indent=2) + "\n"
-            prompt += one_shot["answer"] + "\n"
-
-        prompt += "\n### Real logs:\n"
-        prompt += json.dumps(logs, indent=2) + "\n\n"
-        prompt += style + questions
+        head, tail = self._prompt_builders.get(topic) or (
+            (PROMPT_HEADER + "\n### Real logs:\n").encode("utf-8"),
+            b"",
+        )
 
+        # Fill the remaining token budget with as many log entries as fit,
+        # serialized compactly (one record per line) to keep token cost down
+        budget = self.max_prompt_tokens - _estimate_tokens(head + tail)
+        lines: List[bytes] = []
+        for record in self.load_logs(file_name):
+            line = orjson.dumps(record)
+            cost = _estimate_tokens(line)
+            if lines and cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+
+        prompt = head + b"\n".join(lines) + tail
         self._prompt_cache[cache_key] = prompt
         return prompt
 
+    def generate_prompt(self, file_name: str, topic: str) -> str:
+        """
+        Generate a model prompt as text; thin wrapper over generate_prompt_bytes.
+
+        Args:
+            file_name (str): Log file name.
+            topic (str): Topic to generate prompt for.
+
+        Returns:
+            str: Constructed prompt for the model.
+        """
+        return self.generate_prompt_bytes(file_name, topic).decode("utf-8")
+
     def show_formatted_answer(self, answer_file: str):
         """
         Print a model's generated answer from a JSON file in a human-readable format.
@@ -245,12 +343,9 @@ class Dataset:
         Raises:
             FileNotFoundError: If the answer file does not exist.
         """
+        # read_bytes raises FileNotFoundError itself, sparing a separate stat
         file_path = Path(answer_file)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        with file_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = orjson.loads(file_path.read_bytes())
 
         print("\n📄 File Information:")
         print(f"Model: {data.get('model', 'Unknown')}")
@@ -263,3 +358,18 @@ class Dataset:
             print("\n" + answer)
         else:
             print("\n(No text-formatted answer was found.)")
+
+
+@lru_cache(maxsize=1)
+def get_dataset(data_path: str = "data") -> Dataset:
+    """
+    Return a shared Dataset for the given path, constructing it only once
+    per process so its file listing and caches are reused by every caller.
+
+    Args:
+        data_path (str): Path to the dataset directory containing .json files.
+
+    Returns:
+        Dataset: The memoized Dataset instance.
+    """
+    return Dataset(data_path)
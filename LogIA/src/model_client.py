@@ -1,9 +1,97 @@
+import hashlib
 import os
 import re
-from openai import OpenAI
+from pathlib import Path
+
+from openai import APIConnectionError, APITimeoutError, OpenAI, RateLimitError
+from tenacity import (
+    retry, retry_if_exception_type,
+    stop_after_attempt, wait_random_exponential
+)
+
+from lib.ratelimit import TokenBucket
 
 DEEPINFRA_BASE_URL = "https://api.deepinfra.com/v1/openai"
 
+# Compiled once: applied to every DeepSeek response
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+# Shared limiter consulted before every chat completion request, so concurrent
+# topic/model workers throttle proactively instead of hitting provider caps.
+_BUCKET = TokenBucket(
+    rpm=int(os.getenv("LOGIA_RPM", "60")),
+    tpm=int(os.getenv("LOGIA_TPM", "90000")),
+)
+
+
+def _estimate_tokens(prompt):
+    """Rough token estimate for a prompt (~4 chars/token) plus completion headroom."""
+    return len(prompt) // 4 + 512
+
+
+# Transient provider errors worth retrying; anything else is re-raised immediately
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError)
+
+
+@retry(
+    reraise=True,
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(min=1, max=30),
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+)
+def _chat_completion(client, model, prompt, temperature):
+    """
+    Issue one chat completion through the shared rate limiter, retrying
+    transient provider errors with jittered exponential backoff.
+    """
+    _BUCKET.acquire(_estimate_tokens(prompt))
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature,
+    )
+    return response.choices[0].message.content.strip()
+
+
+# --------------------------
+# Persistent response cache
+# --------------------------
+# Responses are stored on disk keyed by sha256(model:prompt), so re-running the
+# pipeline with unchanged prompts skips the HTTP call entirely. Disable with
+# the --no-cache flag on the generator scripts.
+CACHE_DIR = Path(".logia_cache")
+cache_enabled = True
+
+
+def set_cache_enabled(enabled):
+    """Enable or disable the persistent response cache."""
+    global cache_enabled
+    cache_enabled = enabled
+
+
+def _cache_path(model, prompt):
+    """Cache file path for a (model, prompt) pair."""
+    key = hashlib.sha256(f"{model}:{prompt}".encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{key}.txt"
+
+
+def _cache_get(model, prompt):
+    """Return the cached response for (model, prompt), or None on miss."""
+    if not cache_enabled:
+        return None
+    path = _cache_path(model, prompt)
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    return None
+
+
+def _cache_set(model, prompt, response):
+    """Store a successful response for (model, prompt)."""
+    if not cache_enabled or not response:
+        return
+    CACHE_DIR.mkdir(exist_ok=True)
+    _cache_path(model, prompt).write_text(response, encoding="utf-8")
+
 # DeepInfra model identifiers
 DEEPINFRA_MODELS = {
     "phi4":            "microsoft/phi-4",
@@ -17,14 +105,25 @@ def build_openai_client():
     return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
+# Singleton OpenAI client, mirroring the DeepInfra one below
+_openai_client = None
+
+
+def get_openai_client():
+    """Return the shared OpenAI client, building it on first use."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = build_openai_client()
+    return _openai_client
+
+
 def query_openai(client, prompt, temperature=0.1):
     """Query OpenAI GPT-4."""
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=temperature,
-    )
-    return response.choices[0].message.content.strip()
+    if (cached := _cache_get("gpt-4", prompt)) is not None:
+        return cached
+    answer = _chat_completion(client, "gpt-4", prompt, temperature)
+    _cache_set("gpt-4", prompt, answer)
+    return answer
 
 
 def build_deepinfra_client():
@@ -35,6 +134,19 @@ def build_deepinfra_client():
     )
 
 
+# Singleton DeepInfra client so every query reuses the same keep-alive
+# connection pool instead of paying a TCP+TLS handshake per request
+_deepinfra_client = None
+
+
+def get_deepinfra_client():
+    """Return the shared DeepInfra client, building it on first use."""
+    global _deepinfra_client
+    if _deepinfra_client is None:
+        _deepinfra_client = build_deepinfra_client()
+    return _deepinfra_client
+
+
 def query_deepinfra(prompt, model_key, temperature=0.0):
     """
     Query a model hosted on DeepInfra.
@@ -52,14 +164,14 @@ def query_deepinfra(prompt, model_key, temperature=0.0):
         print(f"Unknown DeepInfra model key: {model_key}")
         return None
 
-    client = build_deepinfra_client()
+    if (cached := _cache_get(model_id, prompt)) is not None:
+        return cached
+
+    client = get_deepinfra_client()
     try:
-        response = client.chat.completions.create(
-            model=model_id,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature,
-        )
-        return response.choices[0].message.content.strip()
+        answer = _chat_completion(client, model_id, prompt, temperature)
+        _cache_set(model_id, prompt, answer)
+        return answer
     except Exception as e:
         print(f"Error querying DeepInfra ({model_id}): {e}")
         return None
@@ -68,5 +180,5 @@ def query_deepinfra(prompt, model_key, temperature=0.0):
 def clean_deepseek_response(response):
     """Remove <think>...</think> tags from DeepSeek model responses."""
     if response:
-        return re.sub(r"<think>.*?</think>", "", response, flags=re.DOTALL).strip()
+        return _THINK_RE.sub("", response).strip()
     return response